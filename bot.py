@@ -1,33 +1,144 @@
+from __future__ import annotations
+
+import io
 import os
 import re
 import json
 import math
-from datetime import datetime, timezone, timedelta
+import sys
+import copy
+import functools
+import heapq
+import time
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 import praw
 
 STOPWORDS_PATH = "tickers_stopwords.txt"
+REDDIT_URL = "https://www.reddit.com"
+
+# purely repeated letters / weird patterns (rare)
+_REJECT_TICKERS = frozenset({"AAAA", "BBBB", "CCCC"})
+
+@functools.lru_cache(maxsize=4)
+def ticker_re(stopwords: frozenset[str]) -> re.Pattern:
+    # Ticker rules, applied to uppercased text:
+    # - $-prefixed 1-letter tickers ($F, $T) are allowed
+    # - otherwise 2-5 letters, optionally $-prefixed
+    # - stopwords/common tokens are rejected inside the pattern, so sre
+    #   drops them without a Python-level check per match
+    # Scans str, not bytes: the encode + per-match decode of a bytes pattern
+    # costs more than sre saves on the narrower input.
+    # sre tries alternatives one by one at every candidate position, so a flat
+    # W1|W2|...|Wn alternation scales with the stopword count (slower than a
+    # set lookup past ~150 words). Grouping by first letter, A(?:ND|RE|S)|...,
+    # means only the words sharing the token's first letter are tried, which
+    # keeps the cost roughly flat into the low thousands of stopwords.
+    by_first: defaultdict[str, list[str]] = defaultdict(list)
+    for w in stopwords | _REJECT_TICKERS:
+        if w:
+            by_first[w[0]].append(w[1:])
+    reject = "|".join(
+        re.escape(first) + "(?:" + "|".join(map(re.escape, sorted(rest, key=len, reverse=True))) + ")"
+        for first, rest in sorted(by_first.items())
+    )
+    return re.compile(
+        rf"(?<![A-Z0-9$])(\$[A-Z]|\$?(?!(?:{reject})(?![A-Z0-9]))[A-Z]{{2,5}})(?![A-Z0-9])"
+    )
 
-TICKER_RE = re.compile(r"(?<![A-Z0-9$])(\$?[A-Z]{1,5})(?![A-Z0-9])")
-
+# path -> (mtime, parsed config); re-read only when the file changes.
+# Callers get a deep copy, so mutating cfg can't leak back into the cache.
+_config_cache: dict[str, tuple[float, dict]] = {}
 
 def load_config(path: str) -> dict:
     try:
+        mtime = os.path.getmtime(path)
+        cached = _config_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
         with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+            cfg = json.load(f)
     except FileNotFoundError:
         return {}
     except Exception:
         return {}
+    _config_cache[path] = (mtime, cfg)
+    return copy.deepcopy(cfg)
+
+def _scan_sub(r: praw.Reddit, s: dict, stopwords: frozenset[str]) -> tuple[dict[str, float], dict[str, tuple[float, str, str]]]:
+    # Score one cross-sub entry; returns partial (agg_score, best) for merging.
+    agg_score: defaultdict[str, float] = defaultdict(float)
+    best: dict[str, tuple[float, str, str]] = {}  # (score, permalink, src)
+
+    name = str(s.get("name", "")).strip()
+    if not name:
+        return agg_score, best
+    weight = float(s.get("weight", 0.35) or 0.35)
+    mode = str(s.get("mode", "hot")).lower().strip()
+    limit_posts = int(s.get("limit_posts", 40) or 40)
+    lookback_hours = int(s.get("lookback_hours", 24) or 24)
+    src = f"r/{name}"
+
+    sub = r.subreddit(name)
+    if mode == "new":
+        it = sub.new(limit=limit_posts)
+    elif mode == "top":
+        # PRAW supports top(time_filter=...) for many installations.
+        try:
+            it = sub.top(time_filter="day", limit=limit_posts)
+        except Exception:
+            it = sub.hot(limit=limit_posts)
+    else:
+        it = sub.hot(limit=limit_posts)
+
+    cutoff_ts = time.time() - lookback_hours * 3600
+    log1p = math.log1p
+    for post in it:
+        try:
+            if post.created_utc < cutoff_ts:
+                # new is newest-first: everything after this is stale too,
+                # so stop before PRAW fetches another page
+                if mode == "new":
+                    break
+                continue
+        except Exception:
+            continue
 
-def _dt_from_utc(ts: float) -> datetime:
-    return datetime.fromtimestamp(ts, tz=timezone.utc)
+        # Submissions always carry these; skip the odd malformed one.
+        try:
+            title = post.title or ""
+            body = post.selftext or ""
+            score = float(post.score or 0)
+            com = float(post.num_comments or 0)
+            permalink = post.permalink or ""
+        except AttributeError:
+            continue
 
-def _within_hours(created_utc: float, hours: int) -> bool:
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-    return _dt_from_utc(created_utc) >= cutoff
+        txt = (title + "\n" + body).strip()
+        tickers = extract_tickers(txt, stopwords)
+        if not tickers:
+            continue
 
-def build_cross_sub_radar(r: praw.Reddit, cfg: dict, stopwords: set[str]) -> list[dict]:
+        # Engagement proxy (bounded) to avoid one post dominating.
+        engagement = min(1.0 + log1p(max(0.0, score)) + 0.5 * log1p(max(0.0, com)), 12.0)
+        inc = weight * engagement
+        for t in tickers:
+            agg_score[t] += inc
+            prev = best.get(t)
+            if prev is None or inc > prev[0]:
+                best[t] = (inc, permalink, src)
+    return agg_score, best
+
+def build_cross_sub_radar(
+    r: praw.Reddit,
+    cfg: dict,
+    stopwords: frozenset[str],
+    make_client: Callable[[], praw.Reddit] | None = None,
+) -> list[dict]:
     # Pull tickers from recent/high-engagement posts across selected subreddits.
     # We only parse title + selftext to keep API load low (no comment crawling).
     if not bool(cfg.get("cross_subs_enabled", False)):
@@ -35,69 +146,48 @@ def build_cross_sub_radar(r: praw.Reddit, cfg: dict, stopwords: set[str]) -> lis
 
     subs = cfg.get("cross_subs", [])
     max_out = int(cfg.get("cross_max_tickers", 8) or 8)
+    if not subs:
+        return []
 
-    agg_score: dict[str, float] = {}
-    best_link: dict[str, tuple[float, str]] = {}  # (score, url)
-    best_src: dict[str, str] = {}
-
-    for s in subs:
-        name = str(s.get("name", "")).strip()
-        if not name:
-            continue
-        weight = float(s.get("weight", 0.35) or 0.35)
-        mode = str(s.get("mode", "hot")).lower().strip()
-        limit_posts = int(s.get("limit_posts", 40) or 40)
-        lookback_hours = int(s.get("lookback_hours", 24) or 24)
-
-        sub = r.subreddit(name)
-        if mode == "new":
-            it = sub.new(limit=limit_posts)
-        elif mode == "top":
-            # PRAW supports top(time_filter=...) for many installations.
-            try:
-                it = sub.top(time_filter="day", limit=limit_posts)
-            except Exception:
-                it = sub.hot(limit=limit_posts)
-        else:
-            it = sub.hot(limit=limit_posts)
-
-        for post in it:
-            try:
-                if not _within_hours(post.created_utc, lookback_hours):
-                    continue
-            except Exception:
-                continue
-
-            title = getattr(post, "title", "") or ""
-            body = getattr(post, "selftext", "") or ""
-            txt = (title + "\n" + body).strip()
-            tickers = set(extract_tickers(txt, stopwords))
-            if not tickers:
-                continue
-
-            # Engagement proxy (bounded) to avoid one post dominating.
-            score = float(getattr(post, "score", 0) or 0)
-            com = float(getattr(post, "num_comments", 0) or 0)
-            engagement = 1.0 + math.log1p(max(0.0, score)) + 0.5 * math.log1p(max(0.0, com))
-            engagement = min(engagement, 12.0)
-
-            url = "https://www.reddit.com" + (getattr(post, "permalink", "") or "")
-            for t in tickers:
-                inc = weight * engagement
-                agg_score[t] = agg_score.get(t, 0.0) + inc
-                prev = best_link.get(t)
-                if prev is None or inc > prev[0]:
-                    best_link[t] = (inc, url)
-                    best_src[t] = f"r/{name}"
-
-    ranked = sorted(agg_score.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)[:max_out]
+    if make_client is None:
+        # No factory: scan sequentially on the caller's client.
+        results = [_scan_sub(r, s, stopwords) for s in subs]
+    else:
+        # Listings are blocking HTTPS round-trips, so fetch subs concurrently.
+        # praw.Reddit isn't thread-safe, so each worker thread gets its own
+        # client from make_client (r is left alone). Each new script-auth
+        # client costs one extra access-token request before its first listing.
+        # Merge in config order so ties resolve the same as a sequential scan.
+        local = threading.local()
+
+        def scan(s: dict):
+            client = getattr(local, "r", None)
+            if client is None:
+                client = local.r = make_client()
+            return _scan_sub(client, s, stopwords)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(subs))) as ex:
+            results = list(ex.map(scan, subs))
+
+    agg_score: defaultdict[str, float] = defaultdict(float)
+    best: dict[str, tuple[float, str, str]] = {}  # (score, permalink, src)
+    for part_score, part_best in results:
+        for t, sc in part_score.items():
+            agg_score[t] += sc
+        for t, cand in part_best.items():
+            prev = best.get(t)
+            if prev is None or cand[0] > prev[0]:
+                best[t] = cand
+
+    ranked = heapq.nlargest(max_out, agg_score.items(), key=lambda kv: (kv[1], kv[0]))
     out = []
     for t, sc in ranked:
+        _, permalink, src = best[t]
         out.append({
             "ticker": t,
             "score": round(sc, 2),
-            "best_post": best_link.get(t, (0.0, None))[1],
-            "best_src": best_src.get(t, None),
+            "best_post": REDDIT_URL + permalink,
+            "best_src": src,
         })
     return out
 def _env_int(name: str, default: int) -> int:
@@ -111,46 +201,31 @@ def _env_str(name: str, default: str) -> str:
     v = os.getenv(name, "")
     return v if v.strip() != "" else default
 
-def load_stopwords() -> set[str]:
-    sw = set()
+@functools.lru_cache(maxsize=1)
+def load_stopwords() -> frozenset[str]:
     try:
         with open(STOPWORDS_PATH, "r", encoding="utf-8") as f:
-            for line in f:
-                t = line.strip().upper()
-                if t and not t.startswith("#"):
-                    sw.add(t)
+            data = f.read()
     except FileNotFoundError:
-        pass
-    return sw
-
-def is_candidate_ticker(raw: str, stopwords: set[str]) -> bool:
-    t = raw.upper()
-    # strip leading $
-    if t.startswith("$"):
-        t2 = t[1:]
-        # allow 1-letter tickers only when written as $F, $T, etc.
-        if len(t2) == 1:
-            return True
-        t = t2
-    # reject 1-letter tickers unless $ prefixed
-    if len(t) == 1:
-        return False
-    # reject stopwords/common tokens
-    if t in stopwords:
-        return False
-    # reject purely vowels / weird patterns (rare)
-    if t in {"AAAA", "BBBB", "CCCC"}:
-        return False
-    return True
-
-def extract_tickers(text: str, stopwords: set[str]) -> list[str]:
+        return frozenset()
+    # only 2-5 letter words can ever be rejected as stopwords
+    # (see ticker_re), so don't carry the rest
+    return frozenset(
+        t for t in (line.strip() for line in data.upper().splitlines())
+        if 2 <= len(t) <= 5 and t.isascii() and t.isalpha()
+    )
+
+def extract_tickers(text: str, stopwords: set[str] | frozenset[str]) -> set[str]:
     if not text:
-        return []
-    out = []
-    for m in TICKER_RE.finditer(text.upper()):
-        raw = m.group(1)
-        if is_candidate_ticker(raw, stopwords):
-            out.append(raw[1:] if raw.startswith("$") else raw)
+        return set()
+    out = set()
+    # findall yields the captured strings directly, skipping a Match object per hit.
+    # ticker_re is cached per stopword set, so it needs a hashable key;
+    # frozenset() hands an existing frozenset back unchanged
+    for raw in ticker_re(frozenset(stopwords)).findall(text.upper()):
+        # interned so every mention shares one str and dict probes
+        # in the aggregators hit the identity fast path
+        out.add(sys.intern(raw[1:] if raw.startswith("$") else raw))
     return out
 
 def praw_client() -> praw.Reddit:
@@ -165,96 +240,102 @@ def praw_client() -> praw.Reddit:
 def find_latest_daily_thread(subreddit: praw.models.Subreddit, title_prefix: str, lookback_hours: int):
     # Search newest posts that start with the prefix
     # We use .new() and filter locally (more reliable than search).
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=lookback_hours)
+    cutoff_ts = time.time() - lookback_hours * 3600
     for post in subreddit.new(limit=50):
-        created = datetime.fromtimestamp(post.created_utc, tz=timezone.utc)
-        if created < cutoff:
+        if post.created_utc < cutoff_ts:
             break
         if post.title.strip().startswith(title_prefix):
             return post
     return None
 
-def build_scoreboard(thread, stopwords: set[str], max_tickers: int):
-    # Pull top-level comments
-    thread.comments.replace_more(limit=0)
+def build_scoreboard(thread, stopwords: frozenset[str], max_tickers: int):
+    # Walk top-level comments as loaded; "load more" stubs are skipped below
+    # rather than stripped up front with replace_more(limit=0).
     top = thread.comments
 
-    # score by unique author count per ticker
-    ticker_authors: dict[str, set[str]] = {}
+    # score by unique author count per ticker; each author gets a small int id
+    # and a ticker's authors are tracked as a bitmask over those ids.
+    # Tradeoff vs sets: each |= copies an int as wide as the highest id seen
+    # (O(authors) per mention, not O(1)). Fine for a daily thread's few hundred
+    # top-level authors (~10 int digits); not for unbounded author counts.
+    author_ids: dict[str, int] = {}
+    ticker_authors: defaultdict[str, int] = defaultdict(int)
     ticker_best_comment: dict[str, tuple[int, str]] = {}  # (score, permalink)
 
     for c in top:
-        if not hasattr(c, "body"):
+        if isinstance(c, praw.models.MoreComments) or not hasattr(c, "body"):
             continue
         if c.author is None:
             continue
         author = str(c.author).lower()
-        tickers = set(extract_tickers(c.body, stopwords))
+        tickers = extract_tickers(c.body, stopwords)
         if not tickers:
             continue
 
+        # track "best" top-level comment by score
+        score = getattr(c, "score", 0) or 0
+        permalink = getattr(c, "permalink", "")
+        author_bit = 1 << author_ids.setdefault(author, len(author_ids))
         for t in tickers:
-            ticker_authors.setdefault(t, set()).add(author)
-            # track "best" top-level comment by score
-            score = getattr(c, "score", 0) or 0
-            link = "https://www.reddit.com" + getattr(c, "permalink", "")
+            ticker_authors[t] |= author_bit
             prev = ticker_best_comment.get(t)
             if prev is None or score > prev[0]:
-                ticker_best_comment[t] = (score, link)
+                ticker_best_comment[t] = (score, permalink)
 
-    ranked = sorted(ticker_authors.items(), key=lambda kv: (len(kv[1]), kv[0]), reverse=True)
-    ranked = ranked[:max_tickers]
+    ticker_counts = {t: bin(mask).count("1") for t, mask in ticker_authors.items()}
+    ranked = heapq.nlargest(max_tickers, ticker_counts.items(), key=lambda kv: (kv[1], kv[0]))
 
     items = []
-    for t, authors in ranked:
+    for t, n_authors in ranked:
         best = ticker_best_comment.get(t)
-        best_link = best[1] if best else None
+        best_link = REDDIT_URL + best[1] if best else None
         items.append({
             "ticker": t,
-            "unique_authors": len(authors),
+            "unique_authors": n_authors,
             "best_comment": best_link
         })
     return items
 
 def format_comment(items, hub_url: str, thread, cross_radar: list[dict]):
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    lines = []
-    lines.append("Daily Scoreboard (Text MVP)")
-    lines.append("")
-    lines.append("Top tickers by unique authors mentioning them in this Daily Scanner thread (not financial advice).")
-    lines.append(f"Updated: {ts}")
-    lines.append("")
+    buf = io.StringIO()
+    w = buf.write
+    w("Daily Scoreboard (Text MVP)\n")
+    w("\n")
+    w("Top tickers by unique authors mentioning them in this Daily Scanner thread (not financial advice).\n")
+    w(f"Updated: {ts}\n")
+    w("\n")
 
     if not items:
-        lines.append("No tickers detected yet. Post in the format: TICKER - catalyst - invalidation - 1 data point.")
+        w("No tickers detected yet. Post in the format: TICKER - catalyst - invalidation - 1 data point.\n")
     else:
         for i, it in enumerate(items, start=1):
             t = it["ticker"]
             n = it["unique_authors"]
             best = it.get("best_comment")
             if best:
-                lines.append(f"{i}. {t} — {n} unique posters — top comment: {best}")
+                w(f"{i}. {t} — {n} unique posters — top comment: {best}\n")
             else:
-                lines.append(f"{i}. {t} — {n} unique posters")
+                w(f"{i}. {t} — {n} unique posters\n")
 
 
     # Cross-subreddit radar (optional)
     if cross_radar:
-        lines.append("Viral radar (cross-subreddit, weighted):")
+        w("Viral radar (cross-subreddit, weighted):\n")
         for it in cross_radar:
             t = it["ticker"]
             sc = it.get("score", 0)
             src = it.get("best_src")
             link = it.get("best_post")
             if link and src:
-                lines.append(f"- {t} — radar score {sc} — {src}: {link}")
+                w(f"- {t} — radar score {sc} — {src}: {link}\n")
             elif link:
-                lines.append(f"- {t} — radar score {sc} — {link}")
+                w(f"- {t} — radar score {sc} — {link}\n")
             else:
-                lines.append(f"- {t} — radar score {sc}")
-        lines.append("")
-    lines.append(f"Templates + rules (Hub): {hub_url}")
-    return "\n".join(lines)
+                w(f"- {t} — radar score {sc}\n")
+        w("\n")
+    w(f"Templates + rules (Hub): {hub_url}")
+    return buf.getvalue()
 
 def main():
     subreddit_name = _env_str("SUBREDDIT", "ShortSqueezeStonks")
@@ -275,13 +356,18 @@ def main():
     if thread is None:
         raise SystemExit(f"Could not find a recent daily thread starting with: {title_prefix}")
 
-    items = build_scoreboard(thread, stopwords, max_tickers=max_tickers)
-    cross_radar = build_cross_sub_radar(r, cfg, stopwords)
+    # The radar doesn't depend on the daily thread's comments, so fetch it
+    # alongside the scoreboard. With make_client it builds its own per-thread
+    # clients and never touches r, which stays with the main thread.
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        radar_future = ex.submit(build_cross_sub_radar, r, cfg, stopwords, make_client=praw_client)
+        items = build_scoreboard(thread, stopwords, max_tickers=max_tickers)
+        cross_radar = radar_future.result()
     comment_body = format_comment(items, hub_url, thread, cross_radar)
 
     print("=== TARGET THREAD ===")
     print(thread.title)
-    print("https://www.reddit.com" + thread.permalink)
+    print(REDDIT_URL + thread.permalink)
     print("")
     print("=== COMMENT PREVIEW ===")
     print(comment_body)